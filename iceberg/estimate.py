@@ -1,10 +1,47 @@
 """Exposes functions to estimate population size given a list of samples."""
 
 from collections import Counter
+from itertools import chain
+import math
 
 import numpy as np
 
 
+def _pack(samples):
+    """Packs a collection of samples into a flat array of integer-encoded
+    entities and an array of offsets delimiting each sample. Entities are
+    encoded by hashing, so any hashable entity is supported and two entities
+    share a code exactly when they are equal.
+
+    Parameters
+    ----------
+    samples: list
+        A list of lists; each element is a list of entities observed in a
+        particular sample.
+
+    Returns
+    -------
+    tuple
+        A tuple (codes, offsets): codes is a flat int32 array in which each
+        distinct entity is represented by an integer, assigned in order of first
+        observation starting from 0; and offsets is an int64 array of length
+        len(samples) + 1 such that the entities observed in sample i are
+        codes[offsets[i]:offsets[i + 1]].
+    """
+
+    offsets = np.zeros(len(samples) + 1, dtype=np.int64)
+    np.cumsum([len(sample) for sample in samples], out=offsets[1:])
+    index = {}
+    codes = np.fromiter(
+        (
+            index.setdefault(entity, len(index))
+            for entity in chain.from_iterable(samples)
+        ),
+        dtype=np.int32, count=offsets[-1]
+    )
+    return codes, offsets
+
+
 def _calculate_error(estimate, num_entities, sample_sizes):
     """Calculates the error of a population estimate given the number of
     entities observed and the sizes of samples taken without replacement.
@@ -15,8 +52,8 @@ def _calculate_error(estimate, num_entities, sample_sizes):
         The estimate of population size to be evaluated.
     num_entities: int
         The number of distinct entities observed.
-    sample_sizes: list
-        A list of integers indicating the size of each sample taken.
+    sample_sizes: np.ndarray
+        A float array indicating the size of each sample taken.
 
     Returns
     -------
@@ -24,16 +61,13 @@ def _calculate_error(estimate, num_entities, sample_sizes):
         The error incurred by this estimate of population size.
     """
 
-    # Contribution to log sample expectation from each sample
-    log_sample_contributions = [
-        np.log(estimate - sample_size) - np.log(estimate)
-        for sample_size in sample_sizes
-    ]
-    # Contribution to log sample expectation from estimated population size
-    log_pop_contribution = np.log(estimate)
-    # Expectation of unobserved entity count from sample distribution
-    sample_expectation = np.exp(
-        sum(log_sample_contributions) + log_pop_contribution
+    # Expectation of unobserved entity count from sample distribution, i.e.,
+    # the estimate multiplied by the probability that an arbitrary entity is
+    # absent from every sample; a sample larger than the estimate cannot miss
+    # any entity, so its ratio is clipped at 0 rather than allowed to go
+    # negative (which would flip the sign of the product)
+    sample_expectation = estimate * np.prod(
+        np.maximum(1.0 - sample_sizes / estimate, 0.0)
     )
     # Expectation of unobserved entity count from counting (i.e., the difference
     # between the estimated population size and the number of observed entities)
@@ -42,53 +76,12 @@ def _calculate_error(estimate, num_entities, sample_sizes):
     return sample_expectation - count_expectation
 
 
-def _recurse_to_best_estimate(
-        lower_bound, upper_bound, num_entities, sample_sizes
-):
-    """Recursively finds the best estimate of population size by identifying
-    which half of [lower_bound, upper_bound] contains the best estimate.
-
-    Parameters
-    ----------
-    lower_bound: int
-        The lower bound of the interval to be tested; the value of the error
-        function can always be assumed to be positive at this point.
-    upper_bound: int
-        The upper bound of the interval to be tested; the value of the error
-        function can always be assumed to be negative at this point.
-    num_entities: int
-        The number of distinct entities observed.
-    sample_sizes: list
-        A list of integers indicating the size of each sample taken.
-
-    Returns
-    -------
-    int
-        The best estimate of population size.
-    """
-
-    # Base case - return the upper bound when the upper and lower bounds are
-    # adjacent
-    if upper_bound - lower_bound <= 1:
-        return upper_bound
-
-    # Otherwise calculate error at midpoint and recursively evaluate the
-    # relevant half of the interval
-    midpoint = int(np.ceil((lower_bound + upper_bound) / 2))
-    error_at_midpoint = _calculate_error(midpoint, num_entities, sample_sizes)
-    if error_at_midpoint > 0:
-        return _recurse_to_best_estimate(
-            midpoint, upper_bound, num_entities, sample_sizes
-        )
-    else:
-        return _recurse_to_best_estimate(
-            lower_bound, midpoint, num_entities, sample_sizes
-        )
-
-
 def _find_best_estimate(num_entities, max_pop_size, sample_sizes):
     """Finds the best integer estimate of population size in the domain
-    [num_entities, max_pop_size]. The time complexity is O(log(max_pop_size)).
+    [max(num_entities, max(sample_sizes)), max_pop_size] by bisection; no
+    population can be smaller than one of its samples, so bisection starts at
+    the largest sample size when a sample repeats entities. The time complexity
+    is O(log(max_pop_size)).
 
     NB: this algorithm relies on the following facts: that the error function is
     decreasing on the entire domain; and that the error function is
@@ -110,87 +103,118 @@ def _find_best_estimate(num_entities, max_pop_size, sample_sizes):
         allowable estimate.
     """
 
+    # Convert sample sizes to an array once so that each evaluation of the
+    # error function is vectorized
+    sample_sizes = np.asarray(sample_sizes, dtype=np.float64)
+
     # Catch cases where maximum allowable estimate is still too low or where
     # minimum allowable estimate is still too high, and return to save
     # computation
     error_at_max = _calculate_error(max_pop_size, num_entities, sample_sizes)
     if error_at_max > 0:
         return max_pop_size
-    error_at_min = _calculate_error(num_entities, num_entities, sample_sizes)
+    min_pop_size = min(
+        max([num_entities] + [int(size) for size in sample_sizes]),
+        max_pop_size
+    )
+    error_at_min = _calculate_error(min_pop_size, num_entities, sample_sizes)
     if error_at_min <= 0:
-        return num_entities
+        return min_pop_size
+
+    # Repeatedly halve the interval, maintaining that the error function is
+    # positive at the lower bound and non-positive at the upper bound, until
+    # the bounds are adjacent
+    lower_bound, upper_bound = min_pop_size, max_pop_size
+    while upper_bound - lower_bound > 1:
+        midpoint = (lower_bound + upper_bound + 1) // 2
+        if _calculate_error(midpoint, num_entities, sample_sizes) > 0:
+            lower_bound = midpoint
+        else:
+            upper_bound = midpoint
 
     # Return the best estimate in the passed domain
-    return _recurse_to_best_estimate(
-        num_entities, max_pop_size, num_entities, sample_sizes
-    )
+    return upper_bound
 
 
-def _cross_validate_estimate(
-        simulated_population, samples, num_observed, cv_ppn
+def _cross_validate_estimates(
+        pop_size, codes, offsets, num_observed, cv, cv_ppn, rng
 ):
-    """Returns a cross-validated estimate of population size.
+    """Returns cross-validated estimates of population size, drawing the
+    validation sets for all cross-validation iterations at once.
 
     Parameters
     ----------
-    simulated_population: list
-        A simulated population containing all observed entities and a number of
-        simulated entities not in any sample.
-    samples: list
-        A list of lists; each element is a list of entities observed in a
-        particular sample.
+    pop_size: int
+        The size of a simulated population whose entities are identified by the
+        integers in [0, pop_size); those in [0, num_observed) are the observed
+        entities and the remainder are simulated entities not in any sample.
+    codes: np.ndarray
+        A flat integer array containing the (integer-encoded) entities observed
+        in every sample, one sample after another.
+    offsets: np.ndarray
+        An integer array of length len(samples) + 1; the entities observed in
+        sample i are codes[offsets[i]:offsets[i + 1]].
     num_observed: int
         The number of distinct entities observed in the samples (this is
-        derivable from samples, but it's already calculated in the calling
+        derivable from codes, but it's already calculated in the calling
         function, so why duplicate effort?).
+    cv: int
+        The number of cross-validation iterations to be performed.
     cv_ppn: float
         The proportion of samples to be used for each cross-validation attempt.
+    rng: np.random.Generator
+        The random number generator used to select and simulate samples.
 
     Returns
     -------
-    int
-        A cross-validated estimate of population size.
+    np.ndarray
+        An integer array of length cv containing the cross-validated estimates
+        of population size.
     """
 
-    # Select samples to hold as a validation set
-    cv_size = int(np.ceil(cv_ppn * len(samples)))
-    validation_samples = np.random.choice(
-        np.array(samples, dtype=object), cv_size, replace=False
-    ).tolist()
-
-    # Construct simulated samples identical in size to the holdout sets
-    simulated_entities = set(
-        entity for simulated_sample in [
-            np.random.choice(
-                simulated_population, len(sample), replace=False
-            ).tolist()
-            for sample in validation_samples
-        ]
-        for entity in simulated_sample
-    )
+    # Select samples to hold as a validation set in each iteration; each row is
+    # the leading cv_size elements of an independent random permutation
+    sample_sizes = np.diff(offsets)
+    n_samples = len(sample_sizes)
+    cv_size = int(np.ceil(cv_ppn * n_samples))
+    validation_indices = np.argsort(
+        rng.random((cv, n_samples)), axis=1
+    )[:, :cv_size]
+    is_validation = np.zeros((cv, n_samples), dtype=bool)
+    np.put_along_axis(is_validation, validation_indices, True, axis=1)
+
+    # Count "new" entities in held-back and simulated samples in each iteration
+    true_new = np.empty(cv, dtype=np.int64)
+    simulated_new = np.empty(cv, dtype=np.int64)
+    for i in range(cv):
+        # Identify entities in samples not held back for cross validation
+        retained = np.zeros(num_observed, dtype=bool)
+        retained[codes[np.repeat(~is_validation[i], sample_sizes)]] = True
+        true_new[i] = num_observed - np.count_nonzero(retained)
+        # Construct simulated samples identical in size to the holdout sets and
+        # count the simulated entities not among the retained ones
+        simulated = np.zeros(pop_size, dtype=bool)
+        simulated[np.concatenate([np.empty(0, dtype=np.int64)] + [
+            rng.choice(pop_size, size, replace=False)
+            for size in sample_sizes[validation_indices[i]]
+        ])] = True
+        simulated_new[i] = (
+            np.count_nonzero(simulated[:num_observed] & ~retained)
+            + np.count_nonzero(simulated[num_observed:])
+        )
 
-    # Identify entities in samples not held back for cross validation
-    retained_samples = [
-        sample for sample in samples if sample not in validation_samples
-    ]
-    retained_entities = set(
-        entity for sample in retained_samples for entity in sample
+    # Determine correction factors and return corrected estimates of population
+    # size
+    correction_factors = (
+        np.maximum(true_new - simulated_new, 0) / np.maximum(simulated_new, 1)
     )
+    corrected_estimates_of_new_entities = np.ceil(
+        (pop_size - num_observed) * (1 + correction_factors)
+    ).astype(np.int64)
+    return num_observed + corrected_estimates_of_new_entities
 
-    # Calculate number of "new" entities in held-back and simulated samples,
-    # determine correction factor
-    true_new = num_observed - len(retained_entities)
-    simulated_new = len(simulated_entities.difference(retained_entities))
-    correction_factor = max(true_new - simulated_new, 0) / max(simulated_new, 1)
 
-    # Return corrected estimate of population size
-    corrected_estimate_of_new_entities = int(np.ceil(
-        (len(simulated_population) - num_observed) * (1 + correction_factor)
-    ))
-    return num_observed + corrected_estimate_of_new_entities
-
-
-def cuthbert(samples, min_survival=0.01, cv=None, cv_ppn=0.2):
+def cuthbert(samples, min_survival=0.01, cv=None, cv_ppn=0.2, rng=None):
     """Estimates population size given a collection of samples without
     replacement, using method proposed in Cuthbert (2009).
 
@@ -207,6 +231,9 @@ def cuthbert(samples, min_survival=0.01, cv=None, cv_ppn=0.2):
         None then cross-validation will be skipped.
     cv_ppn: float
         The proportion of samples to be used for each cross-validation attempt.
+    rng: np.random.Generator, int, or None
+        The random number generator (or a seed for one) used in
+        cross-validation; if None then a freshly seeded generator is used.
 
     Returns
     -------
@@ -218,36 +245,62 @@ def cuthbert(samples, min_survival=0.01, cv=None, cv_ppn=0.2):
     # Initialize result
     estimates = {'uncorrected': 0, 'corrected': []}
 
-    # Generate an uncorrected estimate of population size by recursively
-    # identifying the estimate of minimum error within the domain defined by the
-    # number of sampled entities and min_survival
+    # Generate an uncorrected estimate of population size by bisecting to the
+    # estimate of minimum error within the domain defined by the number of
+    # sampled entities and min_survival
     sample_sizes = [len(sample) for sample in samples]
-    entities = set(entity for sample in samples for entity in sample)
-    max_pop_size = int(np.ceil(len(entities) / min_survival))
+    num_entities = len(set(chain.from_iterable(samples)))
+    max_pop_size = int(np.ceil(num_entities / min_survival))
     estimates['uncorrected'] = _find_best_estimate(
-        len(entities), max_pop_size, sample_sizes
+        num_entities, max_pop_size, sample_sizes
     )
 
-    # If indicated, generate corrected estimates using cross-validation
+    # If indicated, generate corrected estimates using cross-validation; the
+    # simulated population is [0, estimates['uncorrected']), with simulated
+    # entities taking the integers not used to encode observed ones
     if cv is not None:
-        # Generate a simulated population the size of the uncorrected estimate
-        simulated_entities = [
-            'simulated_entity_' + str(i)
-            for i in range(estimates['uncorrected'] - len(entities))
-        ]
-        simulated_population = list(entities) + simulated_entities
-        # Calculate cv cross-validated estimates
-        for _ in range(cv):
-            estimates['corrected'].append(
-                _cross_validate_estimate(
-                    simulated_population, samples, len(entities), cv_ppn
-                )
-            )
+        codes, offsets = _pack(samples)
+        estimates['corrected'] = _cross_validate_estimates(
+            estimates['uncorrected'], codes, offsets, num_entities, cv, cv_ppn,
+            np.random.default_rng(rng)
+        ).tolist()
 
     # Return final result
     return estimates
 
 
+def _bbc_fixed_point(biased_est, singletons, max_delta):
+    """Corrects for bias in the BBC estimate of the number of unobserved
+    entities by fixed-point iteration, as suggested in Boneh, Boneh, and Caron
+    (1998).
+
+    Parameters
+    ----------
+    biased_est: float
+        The biased estimate of the number of unobserved entities.
+    singletons: float
+        The number of entities observed exactly once.
+    max_delta: float
+        The incremental change to which the correction algorithm must converge
+        prior to termination.
+
+    Returns
+    -------
+    float
+        The corrected estimate of the number of unobserved entities.
+    """
+
+    corrected_est = biased_est
+    delta = max_delta + 1
+    while delta > max_delta:
+        previous_est = corrected_est
+        corrected_est = biased_est + (
+            previous_est * math.exp(-1 * singletons / previous_est)
+        )
+        delta = abs(corrected_est - previous_est)
+    return corrected_est
+
+
 def bbc(samples, max_delta=0.001):
     """Estimates population size given a collection of samples without
     replacement, using method proposed in Boneh, Boneh, and Caron (1998).
@@ -272,32 +325,27 @@ def bbc(samples, max_delta=0.001):
         If there are no entities observed exactly once.
     """
 
-    # Generate a dictionary mapping natural numbers, n, to the number of
-    # entities observed n times across all samples
-    entity_counts = dict(Counter(
-        [entity for sample in samples for entity in sample]
-    ))
-    frequency_counts = dict(Counter(list(entity_counts.values())))
+    # Count the number of times each entity was observed across all samples;
+    # entities are counted by hashing, so any hashable entity is supported
+    entity_counts = Counter(chain.from_iterable(samples))
+    entity_counts = np.fromiter(
+        entity_counts.values(), dtype=np.int64, count=len(entity_counts)
+    )
+    singletons = np.count_nonzero(entity_counts == 1)
 
     # Raise value error if no singletons
-    if frequency_counts.get(1) is None:
+    if singletons == 0:
         raise ValueError('no entity was observed exactly once')
 
-    # Generate biased estimate of the number of unobserved entities
-    biased_est = sum(
-        [frequency_counts[f] / np.exp(f) for f in frequency_counts]
-    )
+    # Generate biased estimate of the number of unobserved entities; each
+    # entity observed n times contributes exp(-n)
+    biased_est = np.exp(-entity_counts.astype(np.float64)).sum()
 
     # Correct for bias in estimate of unobserved entities via BBC's suggested
     # algorithm
-    corrected_est = biased_est
-    delta = max_delta + 1
-    while delta > max_delta:
-        previous_est = corrected_est
-        corrected_est = biased_est + (
-            previous_est * np.exp(-1 * frequency_counts[1] / previous_est)
-        )
-        delta = abs(corrected_est - previous_est)
+    corrected_est = _bbc_fixed_point(
+        float(biased_est), float(singletons), max_delta
+    )
 
     # Return corrected estimated total population size
     corrected_est = int(np.ceil(corrected_est))
@@ -1,11 +1,31 @@
 """Exposes several functions that simulate situations illustrating the
 capabilities of the estimators defined elsewhere in iceberg."""
 
+from typing import NamedTuple
+
 import numpy as np
 
 import iceberg.estimate as est
 
 
+class SimulationResult(NamedTuple):
+    """Immutable container for the results of a simulation.
+
+    Attributes
+    ----------
+    entities_observed: int
+        The number of distinct entities observed across all simulated samples.
+    bbc: int
+        The BBC estimate of population size.
+    cuthbert: int
+        The (uncorrected) Cuthbert estimate of population size.
+    """
+
+    entities_observed: int
+    bbc: int
+    cuthbert: int
+
+
 def identical_samples_save_one(n_samples=10, sample_size=10):
     """Simulates a collection of n_samples identical samples of size
     sample_size, appends one unique entity to one sample, and calculates the BBC
@@ -15,7 +35,7 @@ def identical_samples_save_one(n_samples=10, sample_size=10):
     Examples
     --------
     >>> identical_samples_save_one()
-    {'bbc': 12, 'cuthbert': 10}
+    SimulationResult(entities_observed=11, bbc=12, cuthbert=10)
 
     Parameters
     ----------
@@ -26,9 +46,9 @@ def identical_samples_save_one(n_samples=10, sample_size=10):
 
     Returns
     -------
-    dict
-        A dictionary of estimates; the structure is { 'bbc': int, 'cuthbert':
-        int }.
+    SimulationResult
+        The number of distinct entities observed and the BBC and Cuthbert
+        estimates of population size.
 
     Raises
     ------
@@ -39,17 +59,17 @@ def identical_samples_save_one(n_samples=10, sample_size=10):
     # Catch bad input
     if n_samples <= 1:
         raise ValueError('n must be greater than 1')
-    # Initialize result structure and simulate samples
-    results = {}
-    samples = [
-        [str(i) for i in range(sample_size)] for _ in range(n_samples)
-    ]
-    samples[0].append(str(sample_size))
-    # Calculate BBC estimate
-    results['bbc'] = est.bbc(samples)
-    results['cuthbert'] = sample_size
-    # Return final results
-    return results
+    # Simulate samples
+    samples = list(np.tile(
+        np.arange(sample_size, dtype=np.int32), (n_samples, 1)
+    ))
+    samples[0] = np.append(samples[0], sample_size)
+    # Calculate BBC estimate and return final results
+    return SimulationResult(
+        entities_observed=sample_size + 1,
+        bbc=est.bbc(samples),
+        cuthbert=sample_size
+    )
 
 
 def unique_entities(n_samples=10, sample_size=10):
@@ -61,9 +81,9 @@ def unique_entities(n_samples=10, sample_size=10):
     Examples
     --------
     >>> unique_entities()
-    {'bbc': 141, 'cuthbert': 4564}
+    SimulationResult(entities_observed=100, bbc=141, cuthbert=4564)
     >>> unique_entities(n_samples=100, sample_size=25)
-    {'bbc': 3503, 'cuthbert': 250000}
+    SimulationResult(entities_observed=2500, bbc=3503, cuthbert=250000)
 
     Parameters
     ----------
@@ -74,9 +94,9 @@ def unique_entities(n_samples=10, sample_size=10):
 
     Returns
     -------
-    dict
-        A dictionary of estimates; the structure is { 'bbc': int, 'cuthbert':
-        int }.
+    SimulationResult
+        The number of distinct entities observed and the BBC and Cuthbert
+        estimates of population size.
 
     Raises
     ------
@@ -87,23 +107,26 @@ def unique_entities(n_samples=10, sample_size=10):
     # Catch bad input
     if n_samples <= 1:
         raise ValueError('n must be greater than 1')
-    # Initialize result structure and simulate samples
-    results = {}
-    samples = [
-        [str(sample_size * i + j) for j in range(sample_size)]
-        for i in range(n_samples)
-    ]
+    # Simulate samples
+    samples = np.arange(
+        n_samples * sample_size, dtype=np.int32
+    ).reshape(n_samples, sample_size)
     # Calculate BBC estimate
-    results['bbc'] = est.bbc(samples)
-    # Append entity '0' to last sample to ensure Cuthbert convergence and
+    bbc_est = est.bbc(samples)
+    # Append entity 0 to last sample to ensure Cuthbert convergence and
     # calculate
-    samples[n_samples - 1].append('0')
-    results['cuthbert'] = est.cuthbert(samples)['uncorrected']
+    samples = list(samples)
+    samples[n_samples - 1] = np.append(samples[n_samples - 1], 0)
+    cuthbert_est = est.cuthbert(samples)['uncorrected']
     # Return final results
-    return results
+    return SimulationResult(
+        entities_observed=n_samples * sample_size,
+        bbc=bbc_est,
+        cuthbert=cuthbert_est
+    )
 
 
-def random_samples(pop_size, sample_sizes, n_samples=None):
+def random_samples(pop_size, sample_sizes, n_samples=None, rng=None):
     """Simulates a random collection of samples taken from a population of a
     given size and returns BBC and (uncorrected) Cuthbert estimates of
     population size. Can construct samples of uniform size or of varying size,
@@ -111,13 +134,15 @@ def random_samples(pop_size, sample_sizes, n_samples=None):
 
     Examples
     --------
-    >>> np.random.seed(1729)
-    >>> random_samples(1000, 20, 20)
-    {'entities_observed': 330, 'bbc': 449, 'cuthbert': 962}
-    >>> random_samples(10000, 20, 200)
-    {'entities_observed': 3297, 'bbc': 4483, 'cuthbert': 9960}
-    >>> random_samples(1000, [10, 10, 20, 20, 25, 25, 30, 40, 80, 160])
-    {'entities_observed': 359, 'bbc': 492, 'cuthbert': 1053}
+    >>> rng = np.random.default_rng(1729)
+    >>> random_samples(1000, 20, 20, rng=rng)
+    SimulationResult(entities_observed=339, bbc=464, cuthbert=1123)
+    >>> random_samples(10000, 20, 200, rng=rng)
+    SimulationResult(entities_observed=3302, bbc=4491, cuthbert=10042)
+    >>> random_samples(
+    ...     1000, [10, 10, 20, 20, 25, 25, 30, 40, 80, 160], rng=rng
+    ... )
+    SimulationResult(entities_observed=356, bbc=487, cuthbert=999)
 
     Parameters
     ----------
@@ -130,12 +155,15 @@ def random_samples(pop_size, sample_sizes, n_samples=None):
     n_samples: int
         If sample_sizes is an int, then n_samples indicates the number of
         uniformly sized samples that should be simulated.
+    rng: np.random.Generator, int, or None
+        The random number generator (or a seed for one) used to simulate
+        samples; if None then a freshly seeded generator is used.
 
     Returns
     -------
-    dict
-        A dictionary of estimates; the structure is { 'entities_observed': int,
-        'bbc': int, 'cuthbert': int }.
+    SimulationResult
+        The number of distinct entities observed and the BBC and (uncorrected)
+        Cuthbert estimates of population size.
 
     Raises
     ------
@@ -151,18 +179,18 @@ def random_samples(pop_size, sample_sizes, n_samples=None):
     ):
         raise ValueError('pop_size must be larger than the largest sample size')
 
-    # Population of dummy entities
-    population = [str(i) for i in range(pop_size)]
-    # Simulate uniformly sized samples if sample_sizes is an integer
+    # Simulate uniformly sized samples if sample_sizes is an integer; entities
+    # are identified by the integers in [0, pop_size)
+    rng = np.random.default_rng(rng)
     if isinstance(sample_sizes, int):
         samples = [
-            np.random.choice(population, sample_sizes, replace=False).tolist()
+            rng.choice(pop_size, sample_sizes, replace=False)
             for _ in range(n_samples)
         ]
     # Simulate samples of varying size if sample_sizes is a list
     elif isinstance(sample_sizes, list):
         samples = [
-            np.random.choice(population, size, replace=False).tolist()
+            rng.choice(pop_size, size, replace=False)
             for size in sample_sizes
         ]
     # Catch any other input
@@ -170,10 +198,10 @@ def random_samples(pop_size, sample_sizes, n_samples=None):
         raise TypeError('sample_sizes must either be a list or an int')
 
     # Calculate and return results
-    results = {}
-    results['entities_observed'] = len(
-        set(entity for sample in samples for entity in sample)
+    return SimulationResult(
+        entities_observed=int(np.count_nonzero(
+            np.bincount(np.concatenate(samples), minlength=pop_size)
+        )),
+        bbc=est.bbc(samples),
+        cuthbert=est.cuthbert(samples)['uncorrected']
     )
-    results['bbc'] = est.bbc(samples)
-    results['cuthbert'] = est.cuthbert(samples)['uncorrected']
-    return results
@@ -1,5 +1,8 @@
 """Non-doctest unit tests for the iceberg library"""
 
+from itertools import chain
+
+import numpy as np
 import pytest
 
 import iceberg.estimate as est
@@ -10,3 +13,115 @@ def test_bbc_singletons():
     samples = [[0, 1], [0, 1]]
     with pytest.raises(ValueError):
         est.bbc(samples)
+
+
+# Ensure that cross-validated Cuthbert estimates are produced for each iteration
+# and never fall below the uncorrected estimate, including when all samples are
+# of uniform size
+def test_cuthbert_cross_validation():
+    samples = [[str(4 * i + j) for j in range(5)] for i in range(10)]
+    estimates = est.cuthbert(samples, cv=5)
+    assert len(estimates['corrected']) == 5
+    assert all(
+        corrected >= estimates['uncorrected']
+        for corrected in estimates['corrected']
+    )
+
+
+# Ensure that cross-validated Cuthbert estimates are reproducible given a seed
+def test_cuthbert_cross_validation_seeded():
+    samples = [[str(4 * i + j) for j in range(5)] for i in range(10)]
+    first = est.cuthbert(samples, cv=5, rng=1729)
+    second = est.cuthbert(samples, cv=5, rng=1729)
+    assert first == second
+
+
+# Ensure that the BBC estimation distinguishes entities exactly as hashing does,
+# so that tuple, mixed-type, and None entities are counted correctly
+def test_bbc_hashable_entities():
+    samples = [[('bach', 1), ('bach', 2)], [('bach', 1), ('handel', 3)]]
+    assert est.bbc(samples) == 5
+    assert est.bbc([[1, '1', 2], [2, 3]]) == 6
+    assert est.bbc([[None, 1], [1, 2]]) == 5
+
+
+# Ensure that cross-validation without any validation samples leaves the
+# uncorrected Cuthbert estimate unchanged rather than failing
+def test_cuthbert_cross_validation_empty_validation_set():
+    samples = [[str(4 * i + j) for j in range(5)] for i in range(10)]
+    estimates = est.cuthbert(samples, cv=3, cv_ppn=0)
+    assert estimates['corrected'] == [estimates['uncorrected']] * 3
+
+
+# Ensure that the Cuthbert estimation distinguishes entities exactly as hashing
+# does, with and without cross-validation; relabelling hashable entities as
+# distinct integers must not change any estimate
+def test_cuthbert_hashable_entities():
+    samples = [[('bach', 1), ('bach', 2)], [('bach', 1), ('handel', 3)]]
+    assert est.cuthbert(samples)['uncorrected'] == 4
+    assert est.cuthbert([[1, '1', 2], [2, 3]])['uncorrected'] == 6
+    samples = [
+        [None, 1, '1', ('bach', 1)], [1, 2, None], ['1', 3, ('bach', 2)],
+        [('bach', 1), 4], [2, '2', 5]
+    ]
+    labels = {}
+    relabelled = [
+        [labels.setdefault(entity, len(labels)) for entity in sample]
+        for sample in samples
+    ]
+    estimates = est.cuthbert(samples, cv=10, rng=1729)
+    assert estimates == est.cuthbert(relabelled, cv=10, rng=1729)
+    assert all(
+        corrected >= estimates['uncorrected']
+        for corrected in estimates['corrected']
+    )
+
+
+# Ensure that cross-validation counts "new" entities exactly as a set-based
+# computation does, given the same random draws, on samples of varying size
+def test_cross_validate_estimates_against_sets():
+    entities = [str(i) for i in range(60)]
+    draws = np.random.default_rng(42)
+    samples = [
+        draws.choice(entities, size, replace=False).tolist()
+        for size in [3, 8, 5, 12, 1, 7, 9, 4, 6, 10]
+    ]
+    codes, offsets = est._pack(samples)
+    num_observed = len(set(chain.from_iterable(samples)))
+    pop_size, cv, cv_ppn = num_observed + 5, 4, 0.3
+    estimates = est._cross_validate_estimates(
+        pop_size, codes, offsets, num_observed, cv, cv_ppn,
+        np.random.default_rng(1729)
+    )
+
+    # Replay the same draws and recompute each estimate with plain sets
+    rng = np.random.default_rng(1729)
+    cv_size = int(np.ceil(cv_ppn * len(samples)))
+    validation_indices = np.argsort(
+        rng.random((cv, len(samples))), axis=1
+    )[:, :cv_size]
+    encoded = [codes[offsets[i]:offsets[i + 1]].tolist()
+               for i in range(len(samples))]
+    for i in range(cv):
+        held = set(validation_indices[i].tolist())
+        simulated_entities = set(chain.from_iterable(
+            rng.choice(pop_size, len(encoded[j]), replace=False).tolist()
+            for j in validation_indices[i]
+        ))
+        retained_entities = set(chain.from_iterable(
+            sample for j, sample in enumerate(encoded) if j not in held
+        ))
+        true_new = num_observed - len(retained_entities)
+        simulated_new = len(simulated_entities - retained_entities)
+        correction_factor = (
+            max(true_new - simulated_new, 0) / max(simulated_new, 1)
+        )
+        assert estimates[i] == num_observed + int(np.ceil(
+            (pop_size - num_observed) * (1 + correction_factor)
+        ))
+
+
+# Ensure that a sample repeating an entity, and hence larger than the number of
+# distinct entities, does not break the bisection for the Cuthbert estimate
+def test_cuthbert_sample_larger_than_entities():
+    assert est.cuthbert([[1, 1, 1, 2], [3]])['uncorrected'] == 4